@@ -1,10 +1,32 @@
 import os
+import sys
 import time
 
 from warehouse_env import WarehouseEnv, EnvConfig
 
-def clear_screen():
-    os.system("cls" if os.name == "nt" else "clear")
+CONTROLS = "Controls: w a s d move | p pickup | o drop | r reset | q quit"
+
+# Move the cursor home and clear the screen. Written as part of a frame
+# instead of spawning a `clear` subprocess.
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+
+# Terminal rows (1-based) of the screen layout. The grid starts right below
+# the env header row and the message and prompt rows follow the grid.
+STATUS_ROW = 2
+HEADER_ROW = 3
+
+def line(row: int, text: str = "") -> str:
+    """
+    Return escapes that replace terminal row `row` with text.
+    """
+    return f"\x1b[{row};1H\x1b[2K{text}"
+
+def write(frame: str) -> None:
+    """
+    Send a whole frame to the terminal with a single write.
+    """
+    sys.stdout.write(frame)
+    sys.stdout.flush()
 
 def main():
     env = WarehouseEnv(
@@ -36,14 +58,21 @@ def main():
         is_windows = False
         get_key = None
 
-    clear_screen()
-    print("Controls: w a s d move | p pickup | o drop | r reset | q quit")
-    print(env.render())
+    if os.name == "nt":
+        # Running any command once makes the Windows console honour ANSI escapes
+        os.system("")
+
+    message_row = HEADER_ROW + env.cfg.height + 1
+    prompt_row = message_row + 1
+
+    # Full redraw once, after that only changed cells are sent
+    write(CLEAR_SCREEN + CONTROLS + env.render_diff(origin_row=HEADER_ROW))
 
     while True:
         if is_windows:
             ch = get_key().lower() # type: ignore
         else:
+            write(line(prompt_row))
             ch = input("cmd: ").strip().lower()[:1] if True else ""
 
         if ch == "q":
@@ -51,9 +80,7 @@ def main():
 
         if ch == "r":
             env.reset(seed=42)
-            clear_screen()
-            print("Controls: w a s d move | p pickup | o drop | r reset | q quit")
-            print(env.render())
+            write(CLEAR_SCREEN + CONTROLS + env.render_diff(origin_row=HEADER_ROW))
             continue
 
         if ch not in keymap:
@@ -61,13 +88,13 @@ def main():
 
         obs, r, done, info = env.step(keymap[ch])
 
-        clear_screen()
-        print("Controls: w a s d move | p pickup | o drop | r reset | q quit")
-        print(f"event={info.get('event')} reward={r} done={done} reason={info.get('done_reason')}")
-        print(env.render())
-
-        if done:
-            print("Episode ended. Press r to reset or q to quit.")
+        status = f"event={info.get('event')} reward={r} done={done} reason={info.get('done_reason')}"
+        message = "Episode ended. Press r to reset or q to quit." if done else ""
+        write(
+            line(STATUS_ROW, status)
+            + env.render_diff(origin_row=HEADER_ROW)
+            + line(message_row, message)
+        )
 
         if is_windows:
             time.sleep(0.02)
@@ -0,0 +1,37 @@
+"""
+Build script for the optional compiled step kernel.
+
+Project metadata lives in pyproject.toml. This file only declares the Cython
+extension warehouse_env._step_cy, a step kernel specialised for 9 x 9 grids.
+The extension is optional: when Cython is missing or compilation fails the
+package still installs and WarehouseEnv uses the generic kernel.
+
+To build it in place for development:
+
+    python setup.py build_ext --inplace
+
+The kernel reads arrays through the NumPy C API, so it is compiled against the
+NumPy headers.
+"""
+from setuptools import Extension, setup
+
+try:
+    import numpy
+    from Cython.Build import cythonize
+except ImportError:
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [
+            Extension(
+                "warehouse_env._step_cy",
+                ["src/warehouse_env/_step_cy.pyx"],
+                include_dirs=[numpy.get_include()],
+                define_macros=[("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")],
+                optional=True,
+            )
+        ],
+        compiler_directives={"language_level": 3},
+    )
+
+setup(ext_modules=ext_modules)
@@ -1,4 +1,5 @@
 from .env import WarehouseEnv
+from .vec_env import VecWarehouseEnv
 from .config import EnvConfig
 
-__all__ = ["WarehouseEnv", "EnvConfig"]
+__all__ = ["WarehouseEnv", "VecWarehouseEnv", "EnvConfig"]
@@ -0,0 +1,191 @@
+from __future__ import annotations
+import os
+import numpy as np
+
+# Kernels run as plain Python by default. A single step is too small for
+# numba's call overhead to pay off and loading the compiled kernel slows down
+# import, so JIT is opt-in: set CARGO_GRID_JIT=1 with numba installed to
+# compile them. Results are identical either way.
+JIT_ENABLED = False
+if os.environ.get("CARGO_GRID_JIT", "") not in ("", "0"):
+    try:
+        from numba import njit
+        JIT_ENABLED = True
+    except ImportError:  # numba is optional
+        pass
+
+if not JIT_ENABLED:
+    def njit(*args, **kwargs):
+        def decorator(fn):
+            return fn
+        return decorator
+
+# Event codes returned by step_kernel, mapped to info["event"] by EVENT_NAMES
+EVENT_MOVE = 0
+EVENT_BUMP = 1
+EVENT_PICKUP = 2
+EVENT_PICKUP_FAILED_ALREADY_CARRYING = 3
+EVENT_PICKUP_FAILED_NO_PACKAGE = 4
+EVENT_DROP_FAILED_NOT_CARRYING = 5
+EVENT_DELIVER = 6
+EVENT_DROP = 7
+
+EVENT_NAMES = (
+    "move",
+    "bump",
+    "pickup",
+    "pickup_failed_already_carrying",
+    "pickup_failed_no_package",
+    "drop_failed_not_carrying",
+    "deliver",
+    "drop",
+)
+
+# Done codes returned by step_kernel, mapped to info["done_reason"] by DONE_REASONS
+DONE_NONE = 0
+DONE_MAX_STEPS = 1
+DONE_BATTERY_EMPTY = 2
+DONE_ALL_DELIVERED = 3
+
+DONE_REASONS = (None, "max_steps", "battery_empty", "all_delivered")
+
+# Per action (x, y) deltas. Only movement actions 0-3 move the agent, the
+# trailing zeros let pickup and drop index the same tables.
+#     up  down  left  right  pickup  drop
+DX = (0,  0,    -1,   1,     0,      0)
+DY = (-1, 1,    0,    0,     0,      0)
+
+# Indices into the rewards array passed to step_kernel
+R_STEP = 0
+R_BUMP = 1
+R_DROP_WRONG = 2
+R_PICKUP = 3
+R_DELIVER = 4
+
+# cache=True keeps the compiled code on disk between runs. fastmath stays off
+# so rewards are summed in the same order and precision as plain Python.
+@njit(cache=True, fastmath=False)
+def step_kernel(
+    action: int,
+    ax: int,
+    ay: int,
+    width: int,
+    walls: np.ndarray,
+    pkg_x: np.ndarray,
+    pkg_y: np.ndarray,
+    pkg_delivered: np.ndarray,
+    carrying_id: int,
+    undelivered: int,
+    battery: int,
+    step_count: int,
+    max_steps: int,
+    gx: int,
+    gy: int,
+    rewards: np.ndarray,
+):
+    """
+    Advance a single environment by one step.
+
+    walls is the padded bitmap described on EnvState, so the grid border reads
+    as a wall and moves need no separate bounds check. Package arrays are
+    updated in place. A carrying_id of -1 means the agent is not carrying
+    anything. The carried package is not moved along with the agent; its
+    pkg_x/pkg_y entries are only written when it is dropped, so readers must
+    use the agent position for it while it is carried. undelivered is the
+    number of packages whose pkg_delivered entry is still zero. The action
+    must already be validated.
+
+    Returns
+    (ax, ay, carrying_id, undelivered, battery, step_count, reward,
+    event_code, done_code)
+    """
+    # Start with the per step penalty
+    reward = 0.0
+    reward += rewards[R_STEP]
+    event = EVENT_MOVE
+
+    # Movement actions
+    if action < 4:
+        nx = ax + DX[action]
+        ny = ay + DY[action]
+
+        # Apply movement only if not a wall, which includes the padding ring
+        # around the grid. Moves are +-1 so nx, ny never leave the padding.
+        if walls[(ny + 1) * (width + 2) + nx + 1] == 0:
+            ax = nx
+            ay = ny
+        else:
+            # Bump means agent stays in place
+            event = EVENT_BUMP
+            reward += rewards[R_BUMP]
+
+    # Pickup action
+    elif action == 4:
+        # Can only pick up if not already carrying and standing on a package
+        if carrying_id >= 0:
+            event = EVENT_PICKUP_FAILED_ALREADY_CARRYING
+        else:
+            event = EVENT_PICKUP_FAILED_NO_PACKAGE
+            for i in range(pkg_x.shape[0]):
+                if pkg_delivered[i] == 0 and pkg_x[i] == ax and pkg_y[i] == ay:
+                    carrying_id = i
+                    event = EVENT_PICKUP
+                    reward += rewards[R_PICKUP]
+                    break
+
+    # Drop action. If at goal while carrying, counts as delivery
+    else:
+        if carrying_id < 0:
+            event = EVENT_DROP_FAILED_NOT_CARRYING
+        else:
+            pkg_x[carrying_id] = ax
+            pkg_y[carrying_id] = ay
+            if ax == gx and ay == gy:
+                pkg_delivered[carrying_id] = 1
+                undelivered -= 1
+                event = EVENT_DELIVER
+                reward += rewards[R_DELIVER]
+            else:
+                event = EVENT_DROP
+                reward += rewards[R_DROP_WRONG]
+            carrying_id = -1
+
+    # Update time and resources each step
+    step_count += 1
+    battery = max(battery - 1, 0)
+
+    # Termination checks
+    done = DONE_NONE
+    if step_count >= max_steps:
+        done = DONE_MAX_STEPS
+    elif battery == 0:
+        done = DONE_BATTERY_EMPTY
+    elif undelivered == 0:
+        done = DONE_ALL_DELIVERED
+
+    return ax, ay, carrying_id, undelivered, battery, step_count, reward, event, done
+
+# Uncompiled step_kernel, for configs numba cannot type such as counters wider
+# than 64 bits or an infinite battery. Same object as step_kernel without JIT.
+step_kernel_py = getattr(step_kernel, "py_func", step_kernel)
+
+def _warm() -> None:
+    """
+    Compile or load step_kernel for the argument types WarehouseEnv uses.
+
+    Run once at import when JIT is enabled, so the first env.step() does not
+    pay for compilation. The dummy inputs must match the real dtypes and
+    flags, including the read only EnvConfig reward table, or numba would
+    compile a second signature.
+    """
+    walls = np.ones(9, dtype=np.uint8)
+    walls[4] = 0
+    pkg_x = np.zeros(1, dtype=np.int32)
+    pkg_y = np.zeros(1, dtype=np.int32)
+    pkg_delivered = np.zeros(1, dtype=np.uint8)
+    rewards = np.zeros(5, dtype=np.float64)
+    rewards.setflags(write=False)
+    step_kernel(0, 0, 0, 1, walls, pkg_x, pkg_y, pkg_delivered, -1, 1, 1, 0, 1, 0, 0, rewards)
+
+if JIT_ENABLED:
+    _warm()
@@ -0,0 +1,168 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+"""
+Cython build of the step kernel specialised for the common 9 x 9 grid.
+
+step_9x9 takes the same arguments as _kernels.step_kernel and returns the same
+tuple, so WarehouseEnv can use either one. The grid size and goal cell are
+compile time constants here, which turns every index computation into
+constant arithmetic. The width, gx and gy arguments are ignored and must be
+9, 8 and 8.
+
+Built by setup.py when Cython and a C compiler are available. The module is
+optional; without it WarehouseEnv uses step_kernel for every grid size.
+
+Arrays are read through raw data pointers rather than typed memoryviews,
+since acquiring five memoryviews per call costs more than the step itself.
+Their dtype and contiguity are checked with cheap C level macros instead.
+
+The counters are long long so any integer config that fits in 64 bits works
+here as it does with step_kernel. WarehouseEnv keeps other configs on
+step_kernel.
+"""
+cimport numpy as cnp
+
+cnp.import_array()
+
+# Grid shape and goal, fixed for this specialisation
+cdef enum:
+    W = 9
+    STRIDE = W + 2   # padded wall bitmap row length
+    GX = W - 1
+    GY = W - 1
+
+# Keep these in sync with the codes and indices in _kernels.py
+cdef enum:
+    EVENT_MOVE = 0
+    EVENT_BUMP = 1
+    EVENT_PICKUP = 2
+    EVENT_PICKUP_FAILED_ALREADY_CARRYING = 3
+    EVENT_PICKUP_FAILED_NO_PACKAGE = 4
+    EVENT_DROP_FAILED_NOT_CARRYING = 5
+    EVENT_DELIVER = 6
+    EVENT_DROP = 7
+
+cdef enum:
+    DONE_NONE = 0
+    DONE_MAX_STEPS = 1
+    DONE_BATTERY_EMPTY = 2
+    DONE_ALL_DELIVERED = 3
+
+cdef enum:
+    R_STEP = 0
+    R_BUMP = 1
+    R_DROP_WRONG = 2
+    R_PICKUP = 3
+    R_DELIVER = 4
+
+cdef int[6] DX = [0, 0, -1, 1, 0, 0]
+cdef int[6] DY = [-1, 1, 0, 0, 0, 0]
+
+cdef inline void _check(cnp.ndarray a, int typenum, Py_ssize_t size) except *:
+    """
+    Raise TypeError unless a is C contiguous with the given dtype and, when
+    size >= 0, that many elements.
+    """
+    if cnp.PyArray_TYPE(a) != typenum or not cnp.PyArray_IS_C_CONTIGUOUS(a):
+        raise TypeError("step_9x9 got an array with the wrong dtype or layout")
+    if size >= 0 and cnp.PyArray_SIZE(a) != size:
+        raise TypeError("step_9x9 got an array with the wrong size")
+
+cpdef tuple step_9x9(
+    int action,
+    int ax,
+    int ay,
+    int width,
+    cnp.ndarray walls,
+    cnp.ndarray pkg_x,
+    cnp.ndarray pkg_y,
+    cnp.ndarray pkg_delivered,
+    int carrying_id,
+    long long undelivered,
+    long long battery,
+    long long step_count,
+    long long max_steps,
+    int gx,
+    int gy,
+    cnp.ndarray rewards,
+):
+    """
+    Advance a single 9 x 9 environment by one step.
+
+    Same contract as _kernels.step_kernel.
+    """
+    _check(walls, cnp.NPY_UINT8, STRIDE * STRIDE)
+    _check(pkg_x, cnp.NPY_INT32, -1)
+    _check(pkg_y, cnp.NPY_INT32, cnp.PyArray_SIZE(pkg_x))
+    _check(pkg_delivered, cnp.NPY_UINT8, cnp.PyArray_SIZE(pkg_x))
+    _check(rewards, cnp.NPY_FLOAT64, 5)
+
+    cdef const unsigned char* w = <const unsigned char*> cnp.PyArray_DATA(walls)
+    cdef int* px = <int*> cnp.PyArray_DATA(pkg_x)
+    cdef int* py = <int*> cnp.PyArray_DATA(pkg_y)
+    cdef unsigned char* delivered = <unsigned char*> cnp.PyArray_DATA(pkg_delivered)
+    cdef const double* R = <const double*> cnp.PyArray_DATA(rewards)
+    cdef Py_ssize_t n = cnp.PyArray_SIZE(pkg_x)
+
+    cdef double reward = 0.0
+    cdef int event = EVENT_MOVE
+    cdef int done = DONE_NONE
+    cdef int nx, ny, i
+
+    # Start with the per step penalty
+    reward += R[R_STEP]
+
+    # Movement actions, the padded bitmap makes the border a wall
+    if action < 4:
+        nx = ax + DX[action]
+        ny = ay + DY[action]
+        if w[(ny + 1) * STRIDE + nx + 1] == 0:
+            ax = nx
+            ay = ny
+        else:
+            event = EVENT_BUMP
+            reward += R[R_BUMP]
+
+    # Pickup action
+    elif action == 4:
+        if carrying_id >= 0:
+            event = EVENT_PICKUP_FAILED_ALREADY_CARRYING
+        else:
+            event = EVENT_PICKUP_FAILED_NO_PACKAGE
+            for i in range(n):
+                if delivered[i] == 0 and px[i] == ax and py[i] == ay:
+                    carrying_id = i
+                    event = EVENT_PICKUP
+                    reward += R[R_PICKUP]
+                    break
+
+    # Drop action. If at goal while carrying, counts as delivery
+    else:
+        if carrying_id < 0:
+            event = EVENT_DROP_FAILED_NOT_CARRYING
+        else:
+            px[carrying_id] = ax
+            py[carrying_id] = ay
+            if ax == GX and ay == GY:
+                delivered[carrying_id] = 1
+                undelivered -= 1
+                event = EVENT_DELIVER
+                reward += R[R_DELIVER]
+            else:
+                event = EVENT_DROP
+                reward += R[R_DROP_WRONG]
+            carrying_id = -1
+
+    # Update time and resources each step
+    step_count += 1
+    # Same clamp as max(battery - 1, 0), a non positive battery reads as 0
+    battery = battery - 1 if battery > 1 else 0
+
+    # Termination checks
+    if step_count >= max_steps:
+        done = DONE_MAX_STEPS
+    elif battery == 0:
+        done = DONE_BATTERY_EMPTY
+    elif undelivered == 0:
+        done = DONE_ALL_DELIVERED
+
+    return ax, ay, carrying_id, undelivered, battery, step_count, reward, event, done
@@ -1,4 +1,5 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+import numpy as np
 
 @dataclass(frozen=True)
 class EnvConfig:
@@ -16,3 +17,26 @@ class EnvConfig:
     penalty_step: float = -1.0
     penalty_bump: float = -5.0
     penalty_drop_wrong: float = -7.0
+
+    def __post_init__(self):
+        # Read only copy of the reward terms in the order step_kernel indexes
+        # them: [penalty_step, penalty_bump, penalty_drop_wrong, reward_pickup,
+        # reward_deliver]. Stored as a plain instance attribute rather than a
+        # dataclass field, so fields(), asdict() and equality ignore it.
+        rewards = np.array(
+            [
+                self.penalty_step,
+                self.penalty_bump,
+                self.penalty_drop_wrong,
+                self.reward_pickup,
+                self.reward_deliver,
+            ],
+            dtype=np.float64,
+        )
+        rewards.setflags(write=False)
+        object.__setattr__(self, "_rewards", rewards)
+
+    def __reduce__(self):
+        # Rebuild through __init__ so pickle and copy recompute a read only
+        # _rewards instead of restoring a writable copy from __dict__
+        return type(self), tuple(getattr(self, f.name) for f in fields(self))
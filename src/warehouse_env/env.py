@@ -1,9 +1,17 @@
 from __future__ import annotations
+from functools import lru_cache
 from typing import Any, Dict, Tuple
+import numpy as np
 from .config import EnvConfig
-from .state import EnvState, Package
+from .state import EnvState
 from .utils import RNG
-from .render import render_ansi
+from .render import render_ansi, render_grid, render_header, blank_grid
+from ._kernels import step_kernel, step_kernel_py, EVENT_NAMES, DONE_NONE, DONE_REASONS
+
+try:
+    from ._step_cy import step_9x9
+except ImportError:  # optional compiled extension, built by setup.py
+    step_9x9 = None
 
 # Actions represented as integers:
 # 0: up, 1: down, 2: left, 3: right, 4: pickup, 5: deliver
@@ -12,6 +20,12 @@ Action = int
 # Observations are returned as a dictionary with mixed value types.
 Obs = Dict[str, Any]
 
+# Number of scalar entries before the package triples in obs_array()
+OBS_HEADER_SIZE = 5
+
+# Agent always starts in the top left cell
+AGENT_START = (0, 0)
+
 class WarehouseEnv:
     """
     A simple grid based warehouse environment.
@@ -23,6 +37,8 @@ class WarehouseEnv:
     reset(seed) -> initial observation
     step(action) -> (observation, reward, done, info)
     render() -> human readable string
+    render_diff(origin_row) -> ANSI escapes redrawing only what changed
+    obs_array(out) -> current observation as a flat int32 vector
     """
 
     def __init__(self, config: EnvConfig | None = None):
@@ -38,14 +54,47 @@ class WarehouseEnv:
         This does not start an episode. Call reset() before step().
         """
         self.cfg = config or EnvConfig()
-        self._rng = RNG.from_seed(0)
 
         # No episode is active until reset() sets an EnvState
         self._state: EnvState | None = None
 
+        # Walls are static for an episode, so their observation is built once
+        # per layout and the same tuple is returned by every step
+        self._walls_obs: tuple[tuple[int, int], ...] = ()
+
         # Goal is the bottom right cell of the grid
         self.goal_pos = (self.cfg.width - 1, self.cfg.height - 1)
 
+        # Config values read by every step, copied onto the env so the hot path
+        # does plain instance attribute loads instead of going through cfg
+        self._W = self.cfg.width
+        self._H = self.cfg.height
+        self._max_steps = self.cfg.max_steps
+        self._battery_cap = self.cfg.battery_capacity
+        self._rewards = self.cfg._rewards
+        self._gx, self._gy = self.goal_pos
+
+        # 9 x 9 grids use the compiled specialisation when it was built, it
+        # takes the same arguments and returns the same values as step_kernel.
+        # Compiled kernels hold counters in 64 bits, so configs that do not
+        # fit run the plain Python kernel instead.
+        fits = _fits_int64(self._max_steps) and _fits_int64(self._battery_cap)
+        if not fits:
+            self._step_kernel = step_kernel_py
+        elif step_9x9 is not None and (self._W, self._H) == (9, 9):
+            self._step_kernel = step_9x9
+        else:
+            self._step_kernel = step_kernel
+
+        # Length of the flat vector written by obs_array()
+        self.obs_size = OBS_HEADER_SIZE + 3 * self.cfg.num_packages
+
+        # Empty grid that render() copies and fills in
+        self._render_template = blank_grid(self._W, self._H)
+
+        # Grid drawn by the last render_diff() call, None forces a full redraw
+        self._prev_grid: bytearray | None = None
+
     def reset(self, seed: int | None = None) -> Obs:
         """
         Start a new episode and return the initial observation.
@@ -53,36 +102,45 @@ class WarehouseEnv:
         Parameters
         seed:
             Seed for deterministic randomness. Same seed produces the same
-            initial package placement and any later random choices.
+            walls and initial package placement. None behaves like seed 0.
 
         Returns
         Obs:
             The initial observation dictionary.
         """
-        # Reset RNG so the episode is reproducible from this seed
-        self._rng = RNG.from_seed(seed)
-
-        # Agent always starts in the top left cell
-        agent_pos = (0, 0)
-
-        # Spawn walls at random valid locations
-        walls = self._spawn_walls(agent_pos)
+        agent_pos = AGENT_START
+
+        # Walls and package spawns at random valid locations. The layout is
+        # drawn from an RNG seeded with this seed, so the episode is
+        # reproducible, and memoized across resets.
+        cfg = self.cfg
+        walls_bytes, positions, self._walls_obs = _generate_layout(
+            0 if seed is None else seed, cfg.width, cfg.height, cfg.num_packages, cfg.wall_fraction
+        )
+        walls = np.frombuffer(walls_bytes, dtype=np.uint8).copy()
 
-        # Spawn packages at random valid locations
-        packages = []
-        for i in range(self.cfg.num_packages):
-            packages.append(Package(id=i, pos=self._spawn_package_pos(agent_pos, walls)))
+        # Package id is the array index
+        n = cfg.num_packages
+        pkg_x = np.array([x for x, _ in positions], dtype=np.int32)
+        pkg_y = np.array([y for _, y in positions], dtype=np.int32)
 
         # Create a fresh episode state
         self._state = EnvState(
             step_count=0,
             agent_pos=agent_pos,
             carrying_id=None,
-            battery=self.cfg.battery_capacity,
-            packages=packages,
+            is_carrying=False,
+            battery=self._battery_cap,
+            pkg_x=pkg_x,
+            pkg_y=pkg_y,
+            pkg_delivered=np.zeros(n, dtype=np.uint8),
+            undelivered=n,
             walls=walls,
         )
 
+        # The terminal no longer shows this episode, so redraw it fully
+        self._prev_grid = None
+
         # Return the observation for the starting state
         return self._obs(self._state)
 
@@ -114,113 +172,45 @@ class WarehouseEnv:
         """
         if self._state is None:
             raise RuntimeError("Call reset() before step().")
-
-        s = self._state
-        info: Dict[str, Any] = {"event": None}
-
-        # Start with the per step penalty
-        reward = 0.0
-        reward += self.cfg.penalty_step
-
-        bumped = False
-        dropped_wrong = False
-        picked_up = False
-        delivered_now = False
-
-        # Movement actions
-        if action in (0, 1, 2, 3):
-            # Compute the attempted next cell.
-            nx, ny = self._move_target(s.agent_pos, action)
-
-            # Apply movement only if still inside grid bounds
-            if self._can_enter(nx, ny, s.walls):
-                s.agent_pos = (nx, ny)
-                info["event"] = "move"
-            else:
-                # Bump means agent stays in place
-                info["event"] = "bump_wall" if (nx, ny) in s.walls else "bump_out_of_bounds"
-                bumped = True
-        
-        # Pickup action
-        elif action == 4:
-            # Can only pick up if not already carrying and standing on a package
-            if (s.is_carrying):
-                info["event"] = "pickup_failed_already_carrying"
-            else:
-                pid = self._package_id_at_agent(s)
-                if pid is None:
-                    info["event"] = "pickup_failed_no_package"
-                else:
-                    s.carrying_id = pid
-                    # Invariant enforcement: attach immediately
-                    self._set_package_pos(s, pid, s.agent_pos)
-                    picked_up = True
-                    info["event"] = "pickup"
-        
-        # Drop action.
-        elif action == 5:
-            # Drop anywhere. If at goal while carrying, counts as delivery
-            if not s.is_carrying:
-                info["event"] = "drop_failed_not_carrying"
-            else:
-                # should never happen, but being safe
-                if s.carrying_id is None:
-                    raise RuntimeError("Inconsistent state: carrying_id is None but is_carrying is True")
-                
-                pid = s.carrying_id
-                self._set_package_pos(s, pid, s.agent_pos)
-
-                if s.agent_pos == self.goal_pos:
-                    self._mark_package_delivered(s, pid)
-                    s.carrying_id = None
-                    delivered_now = True
-                    info["event"] = "deliver"
-                else:
-                    s.carrying_id = None
-                    dropped_wrong = True
-                    info["event"] = "drop"
-        else:
+        if action not in (0, 1, 2, 3, 4, 5):
             raise ValueError(f"Invalid action: {action}")
 
-        # Apply bump penalty and annotate event
-        if bumped:
-            reward += self.cfg.penalty_bump
-            info["event"] = "bump"
-
-        # Apply drop penalty if wrong drop
-        if dropped_wrong:
-            reward += self.cfg.penalty_drop_wrong
-
-        # Apply pickup reward
-        if picked_up:
-            reward += self.cfg.reward_pickup
+        s = self._state
+        ax, ay = s.agent_pos
+
+        # The kernel uses -1 for "not carrying" so it only deals with ints
+        carrying_id = -1 if s.carrying_id is None else s.carrying_id
+
+        ax, ay, carrying_id, undelivered, battery, step_count, reward, event, done_code = self._step_kernel(
+            int(action),
+            ax,
+            ay,
+            self._W,
+            s.walls,
+            s.pkg_x,
+            s.pkg_y,
+            s.pkg_delivered,
+            carrying_id,
+            s.undelivered,
+            s.battery,
+            s.step_count,
+            self._max_steps,
+            self._gx,
+            self._gy,
+            self._rewards,
+        )
 
-        # Apply delivery reward
-        if delivered_now:
-            reward += self.cfg.reward_deliver
+        s.agent_pos = (ax, ay)
+        s.is_carrying = carrying_id >= 0
+        s.carrying_id = carrying_id if s.is_carrying else None
+        s.undelivered = undelivered
+        s.battery = battery
+        s.step_count = step_count
 
-        # Keep carried package attached to the agent
-        if s.is_carrying:
-            # should never happen, but being safe
-            if s.carrying_id is None:
-                raise RuntimeError("Inconsistent state: carrying_id is None but is_carrying is True")
-            self._set_package_pos(s, s.carrying_id, s.agent_pos)
-
-        # Update time and resources each step
-        s.step_count += 1
-        s.battery = max(s.battery - 1, 0)
-
-        # Termination checks
-        done = False
-        if s.step_count >= self.cfg.max_steps:
-            done = True
-            info["done_reason"] = "max_steps"
-        elif s.battery == 0:
-            done = True
-            info["done_reason"] = "battery_empty"
-        elif self._all_delivered(s):
-            done = True
-            info["done_reason"] = "all_delivered"
+        info: Dict[str, Any] = {"event": EVENT_NAMES[event]}
+        done = done_code != DONE_NONE
+        if done:
+            info["done_reason"] = DONE_REASONS[done_code]
 
         # Store updated state and return the step tuple
         self._state = s
@@ -234,141 +224,203 @@ class WarehouseEnv:
         """
         if self._state is None:
             return ""
-        return render_ansi(self._state, self.cfg.width, self.cfg.height, self.goal_pos)
+        return render_ansi(
+            self._state, self._W, self._H, self.goal_pos, self._render_template
+        )
+
+    def render_diff(self, origin_row: int = 1) -> str:
+        """
+        Render the current state as ANSI escapes that update a terminal in place.
+
+        The frame has the same layout as render(), with the header line drawn
+        at 1-based terminal row origin_row and the grid below it. The first
+        call after reset() draws the whole frame. Later calls rewrite the
+        header line and only the grid cells that changed since the previous
+        call, so an agent step costs a few bytes instead of a full redraw.
+
+        Returns an empty string if the environment has not been reset yet.
+        """
+        if self._state is None:
+            return ""
+
+        grid = render_grid(
+            self._state, self._W, self._H, self.goal_pos, self._render_template
+        )
+        prev = self._prev_grid
+        self._prev_grid = grid
+
+        # Cursor to the start of the header row, then clear that line
+        parts = [f"\x1b[{origin_row};1H\x1b[2K", render_header(self._state)]
+        top = origin_row + 1
+        stride = self._W + 1
+
+        if prev is None:
+            rows = grid[:-1].decode("ascii").split("\n")
+            for y, row in enumerate(rows):
+                parts.append(f"\x1b[{top + y};1H{row}")
+        else:
+            changed = np.flatnonzero(np.frombuffer(grid, np.uint8) != np.frombuffer(prev, np.uint8))
+            for i in changed.tolist():
+                y, x = divmod(i, stride)
+                parts.append(f"\x1b[{top + y};{x + 1}H{chr(grid[i])}")
+
+        return "".join(parts)
+
+    def obs_array(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Write the dynamic part of the current observation into a flat array.
+
+        Layout
+        [agent_x, agent_y, battery, carrying_id (-1 if none), step_count,
+        pkg0_x, pkg0_y, pkg0_delivered, pkg1_x, ...]
+
+        The goal and walls are static for an episode, so they are only
+        reported by the dictionary observation.
+
+        Parameters
+        out:
+            Optional int32 array of length obs_size to fill in place. Reusing
+            one buffer across steps avoids allocating a new observation per
+            step. The returned array is that same buffer, so copy it before
+            the next call if you need to keep it.
+
+        Returns
+        The filled int32 array.
+        """
+        if self._state is None:
+            raise RuntimeError("Call reset() before obs_array().")
+        if out is None:
+            out = np.empty(self.obs_size, dtype=np.int32)
+        elif out.shape != (self.obs_size,):
+            raise ValueError(f"out must have shape ({self.obs_size},), got {out.shape}")
+
+        s = self._state
+        ax, ay = s.agent_pos
+        carrying = -1 if s.carrying_id is None else s.carrying_id
+        out[:OBS_HEADER_SIZE] = (ax, ay, s.battery, carrying, s.step_count)
+
+        # Package triples are interleaved, so each field is a strided slice
+        out[OBS_HEADER_SIZE::3] = s.pkg_x
+        out[OBS_HEADER_SIZE + 1::3] = s.pkg_y
+        out[OBS_HEADER_SIZE + 2::3] = s.pkg_delivered
+
+        # The carried package travels with the agent
+        if carrying >= 0:
+            out[OBS_HEADER_SIZE + 3 * carrying] = ax
+            out[OBS_HEADER_SIZE + 3 * carrying + 1] = ay
+        return out
 
     def _obs(self, s: EnvState) -> Obs:
         """
         Convert internal EnvState into an external observation dictionary.
         """
+        packages = [
+            ((x, y), d)
+            for x, y, d in zip(s.pkg_x.tolist(), s.pkg_y.tolist(), s.pkg_delivered.tolist())
+        ]
+
+        # The carried package travels with the agent
+        if s.is_carrying:
+            packages[s.carrying_id] = (s.agent_pos, 0)
+
         return {
             "agent_pos": s.agent_pos,
             "battery": s.battery,
             "carrying": s.carrying_id,
-            "packages": [(p.pos, int(p.delivered)) for p in s.packages],
+            "packages": packages,
             "goal_pos": self.goal_pos,
-            "walls": sorted(list(s.walls)),
+            "walls": self._walls_obs,
             "step_count": s.step_count,
         }
-    
-    def _spawn_walls(self, agent_pos: tuple[int, int]) -> set[tuple[int, int]]:
-        """
-        Randomly generate wall positions on the grid.
 
-        Walls will never be placed on the agent start position or the goal cell.
-        The number of walls is determined by wall_fraction of available cells.
-        """
-        ax, ay = agent_pos
-        gx, gy = self.goal_pos
-
-        # Build the set of valid grid cells
-        candidates: list[tuple[int, int]] = []
-        for y in range(self.cfg.height):
-            for x in range(self.cfg.width):
-                if (x, y) == (ax, ay):
-                    continue
-                if (x, y) == (gx, gy):
-                    continue
-                candidates.append((x, y))
-
-        # Randomly select a subset of candidates to become walls
-        total = len(candidates)
-        k = int(total * self.cfg.wall_fraction)
-
-        # Pick uniformly from valid candidates
-        walls: set[tuple[int, int]] = set()
-        for _ in range(k):
-            if not candidates:
-                break
-            pos = self._rng.choice(candidates)
-            candidates.remove(pos)
-            walls.add(pos)
-
-        return walls
-
-    def _spawn_package_pos(self, agent_pos: tuple[int, int], walls: set[tuple[int, int]]) -> tuple[int, int]:
-        """
-        Choose a random spawn position for a package.
+def _fits_int64(value: Any) -> bool:
+    """
+    Return True if value is an int that a C long long can hold.
+    """
+    return isinstance(value, int) and -(2**63) <= value < 2**63
 
-        The position will never equal the agent start position or the goal cell.
-        """
-        ax, ay = agent_pos
-        gx, gy = self.goal_pos
-
-        # Build the set of valid grid cells
-        candidates = []
-        for y in range(self.cfg.height):
-            for x in range(self.cfg.width):
-                # Don't allow the agent start cell, goal cell, or wall cells
-                pos = (x, y)
-                if pos == (ax, ay):
-                    continue
-                if pos == (gx, gy):
-                    continue
-                if pos in walls:
-                    continue
-                candidates.append(pos)
-
-        # Pick uniformly from valid candidates
-        return self._rng.choice(candidates)
-
-    def _move_target(self, pos: tuple[int, int], action: int) -> tuple[int, int]:
-        """
-        Compute the attempted next position for a movement action.
-        """
-        x, y = pos
-        if action == 0:   # up
-            return (x, y - 1)
-        if action == 1:   # down
-            return (x, y + 1)
-        if action == 2:   # left
-            return (x - 1, y)
-        return (x + 1, y) # right (action == 3)
-
-    def _can_enter(self, x: int, y: int, walls: set[tuple[int, int]]) -> bool:
-        """
-        Return True if (x, y) lies within the grid and is not a wall.
-        """
-        return 0 <= x < self.cfg.width and 0 <= y < self.cfg.height and (x, y) not in walls
+# Layout generation. A layout depends only on the seed and a few config
+# fields, so it is memoized across resets and env instances.
 
-    def _package_id_at_agent(self, s: EnvState) -> int | None:
-        """
-        Return Package id if the agent is standing on an undelivered package.
-        """
-        for p in s.packages:
-            if (not p.delivered) and (p.pos == s.agent_pos):
-                return p.id
-        return None
+@lru_cache(maxsize=None)
+def _spawn_cells(width: int, height: int) -> np.ndarray:
+    """
+    Return the flat indices (y * width + x) of every cell except the agent
+    start and the goal. Walls and packages spawn only on these cells.
 
-    def _set_package_pos(self, s: EnvState, pid: int, new_pos: tuple[int, int]) -> None:
-        """
-        Move the package with the given id to a new position.
+    The returned array is shared between callers and is read only.
+    """
+    ax, ay = AGENT_START
+    cells = np.arange(width * height)
+    keep = (cells != ay * width + ax) & (cells != (height - 1) * width + (width - 1))
+    cells = cells[keep]
+    cells.setflags(write=False)
+    return cells
+
+@lru_cache(maxsize=128)
+def _generate_layout(
+    seed: int,
+    width: int,
+    height: int,
+    num_packages: int,
+    wall_fraction: float,
+) -> tuple[bytes, tuple[tuple[int, int], ...], tuple[tuple[int, int], ...]]:
+    """
+    Generate the walls and initial package positions for an episode.
 
-        This is used after a successful pickup action to move the package with
-        the agent.
-        """
-        for p in s.packages:
-            if p.id == pid:
-                p.pos = new_pos
-                return
-        raise RuntimeError("Carrying package id not found in state")
+    Returns the padded wall bitmap laid out as EnvState.walls, one (x, y)
+    spawn position per package, and the sorted (x, y) wall coordinates used
+    as obs["walls"]. Results are cached, so a reset with a seen seed and
+    config only copies the bitmap and reuses the immutable tuples.
+    """
+    rng = RNG.from_seed(seed)
+    walls = _spawn_walls(rng, width, height, wall_fraction)
+    candidates = _package_candidates(walls, width, height)
+    positions = tuple(_spawn_package_pos(rng, candidates, width) for _ in range(num_packages))
+    walls_obs = tuple(sorted((i % width, i // width) for i in np.flatnonzero(walls).tolist()))
+
+    # Surround the grid with a ring of walls so the step kernel can treat
+    # leaving the grid like bumping into a wall
+    padded = np.ones((height + 2, width + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = walls.reshape(height, width)
+    return padded.tobytes(), positions, walls_obs
+
+def _spawn_walls(rng: RNG, width: int, height: int, wall_fraction: float) -> np.ndarray:
+    """
+    Randomly generate wall positions on the grid.
 
-    def _mark_package_delivered(self, s: EnvState, pid: int) -> None:
-        """
-        Mark the first undelivered package as delivered.
+    Walls will never be placed on the agent start position or the goal cell.
+    The number of walls is determined by wall_fraction of available cells.
 
-        This is used after a successful delivery action.
-        """
-        for p in s.packages:
-            if p.id == pid:
-                p.delivered = True
-                return
-        raise RuntimeError("Carrying package id not found in state")
+    Returns an unpadded width * height bitmap indexed by y * width + x.
+    """
+    cells = _spawn_cells(width, height)
 
-    def _all_delivered(self, s: EnvState) -> bool:
-        """
-        Return True if all packages in the episode have been delivered.
-        """
-        for p in s.packages:
-            if not p.delivered:
-                return False
-        return True
+    # Randomly select a subset of candidates to become walls, sampled without
+    # replacement in a single generator call
+    total = len(cells)
+    k = min(int(total * wall_fraction), total)
+
+    walls = np.zeros(width * height, dtype=np.uint8)
+    walls[cells[rng.choice_without_replacement(total, k)]] = 1
+    return walls
+
+def _package_candidates(walls: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Return the flat indices of cells a package may spawn on.
+
+    These are the spawn cells that did not become walls.
+    """
+    cells = _spawn_cells(width, height)
+    return cells[walls[cells] == 0]
+
+def _spawn_package_pos(rng: RNG, candidates: np.ndarray, width: int) -> tuple[int, int]:
+    """
+    Choose a random spawn position for a package.
+
+    The position will never equal the agent start position, the goal cell,
+    or a wall cell.
+    """
+    # Pick uniformly from valid candidates
+    i = int(rng.choice(candidates))
+    return (i % width, i // width)
@@ -1,7 +1,14 @@
 from __future__ import annotations
+import numpy as np
 from .state import EnvState
 
-def render_ansi(state: EnvState, width: int, height: int, goal: tuple[int, int]) -> str:
+def render_ansi(
+    state: EnvState,
+    width: int,
+    height: int,
+    goal: tuple[int, int],
+    template: bytes | None = None,
+) -> str:
     """
     Convert the environment state into a simple ASCII grid representation.
 
@@ -23,33 +30,68 @@ def render_ansi(state: EnvState, width: int, height: int, goal: tuple[int, int])
         Grid height.
     goal:
         Coordinates of the delivery goal.
+    template:
+        Optional result of blank_grid(width, height) to reuse between calls.
 
     Returns
     A multi line string suitable for printing to the terminal.
     """
-    ax, ay = state.agent_pos
-    gx, gy = goal
+    grid = render_grid(state, width, height, goal, template)
+
+    # Drop the trailing newline of the last row
+    return render_header(state) + "\n" + grid[:-1].decode("ascii")
+
+def render_header(state: EnvState) -> str:
+    """
+    Return the status line shown above the grid.
+    """
+    return f"step={state.step_count} battery={state.battery} carrying={state.carrying_id}"
 
-    grid = [["." for _ in range(width)] for _ in range(height)]
+def render_grid(
+    state: EnvState,
+    width: int,
+    height: int,
+    goal: tuple[int, int],
+    template: bytes | None = None,
+) -> bytearray:
+    """
+    Draw the grid cells into a new buffer using the render_ansi() symbols.
 
-    # walls
-    for (wx, wy) in state.walls:
-        grid[wy][wx] = "#"
+    Each row is width cells followed by a newline, so cell (x, y) lives at
+    byte y * (width + 1) + x. Parameters are the same as for render_ansi().
+    """
+    if template is None:
+        template = blank_grid(width, height)
 
-    # packages (undelivered)
-    for p in state.packages:
-        if not p.delivered:
-            px, py = p.pos
-            grid[py][px] = "$"
+    stride = width + 1
+    buf = bytearray(template)
+    cells = np.frombuffer(buf, dtype=np.uint8)
+
+    # walls, skipping the padding ring around the stored bitmap
+    walls = state.walls.reshape(height + 2, width + 2)[1:-1, 1:-1]
+    cells.reshape(height, stride)[:, :width][walls != 0] = ord("#")
+
+    # packages (undelivered), a carried package is hidden under the agent
+    for pid, (px, py, d) in enumerate(
+        zip(state.pkg_x.tolist(), state.pkg_y.tolist(), state.pkg_delivered.tolist())
+    ):
+        if not d and pid != state.carrying_id:
+            buf[py * stride + px] = ord("$")
 
     # goal
-    grid[gy][gx] = "G"
+    gx, gy = goal
+    buf[gy * stride + gx] = ord("G")
 
     # agent (overrides any other symbol)
-    grid[ay][ax] = "A"
+    ax, ay = state.agent_pos
+    buf[ay * stride + ax] = ord("A")
+    return buf
 
-    lines = []
-    lines.append(f"step={state.step_count} battery={state.battery} carrying={state.carrying_id}")
-    for row in grid:
-        lines.append("".join(row))
-    return "\n".join(lines)
+def blank_grid(width: int, height: int) -> bytes:
+    """
+    Build an empty grid of '.' cells with a newline after every row.
+
+    render_grid() copies this template and writes symbols into it, so callers
+    that render the same grid size repeatedly can build it once and pass it in.
+    """
+    return (b"." * width + b"\n") * height
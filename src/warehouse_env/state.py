@@ -1,24 +1,48 @@
 from dataclasses import dataclass
-from typing import Tuple, List
+from typing import Tuple
+import numpy as np
 
 # A grid coordinate stored as (x, y)
 Pos = Tuple[int, int]
 
-@dataclass
-class Package:
-    id: int
-    pos: Pos
-    delivered: bool = False
+# Packed per environment record used by VecWarehouseEnv. Fields are sized for
+# grids up to 255 x 255, batteries up to 255 and up to 127 packages, which
+# keeps a whole batch small enough to stay in cache. The step counter is wider
+# so it keeps counting past max_steps when a done slot is stepped again.
+STATE_DTYPE = np.dtype(
+    [
+        ("ax", "u1"),
+        ("ay", "u1"),
+        ("battery", "u1"),
+        ("carry", "i1"),           # carried package id, -1 if none
+        ("undelivered", "u1"),
+        ("step", "u4"),
+    ]
+)
 
-@dataclass
+# slots=True stores fields in fixed slots instead of a per instance __dict__,
+# which makes the per step attribute reads and writes cheaper
+@dataclass(slots=True)
 class EnvState:
     step_count: int
     agent_pos: Pos
     carrying_id: int | None
+
+    # Plain field kept equal to (carrying_id is not None) wherever carrying_id
+    # is assigned, so reading it costs no property call
+    is_carrying: bool
     battery: int
-    packages: List[Package]
-    walls: set[Pos]
 
-    @property
-    def is_carrying(self) -> bool:
-        return self.carrying_id is not None
\ No newline at end of file
+    # Packages stored as parallel arrays indexed by package id. While a
+    # package is carried its position is agent_pos, not its pkg_x/pkg_y entry.
+    pkg_x: np.ndarray          # int32
+    pkg_y: np.ndarray          # int32
+    pkg_delivered: np.ndarray  # uint8, nonzero once delivered
+
+    # Number of zero entries in pkg_delivered, so termination is O(1)
+    undelivered: int
+
+    # Wall bitmap padded with a one cell ring of walls around the grid,
+    # (width + 2) * (height + 2) entries indexed by (y + 1) * (width + 2) + x + 1.
+    # Nonzero marks a wall.
+    walls: np.ndarray          # uint8
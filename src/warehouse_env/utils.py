@@ -1,5 +1,5 @@
 from __future__ import annotations
-import random
+import numpy as np
 from dataclasses import dataclass
 
 @dataclass
@@ -7,23 +7,43 @@ class RNG:
     """
     A deterministic random number generator wrapper used by the environment.
 
-    This class isolates randomness from Python's global random state so that
-    simulations are reproducible. Two environments created with the same seed
-    will produce identical sequences of random values.
+    This class isolates randomness from Python's and NumPy's global random
+    state so that simulations are reproducible. Two environments created with
+    the same seed will produce identical sequences of random values.
 
     Use from_seed() to construct instances instead of calling the constructor
     directly.
     """
-    _r: random.Random
+    _r: np.random.Generator
 
     @classmethod
     def from_seed(cls, seed: int | None) -> "RNG":
+        """
+        Build an RNG from any Python int seed. None behaves like seed 0.
+
+        NumPy only accepts non-negative seeds, so a negative seed uses its
+        absolute value with a separate spawn key. That keeps -n and n on
+        different streams while non-negative seeds seed the Generator directly.
+        """
         if seed is None:
             seed = 0
-        return cls(random.Random(seed))
+        if seed < 0:
+            return cls(np.random.default_rng(np.random.SeedSequence(-seed, spawn_key=(1,))))
+        return cls(np.random.default_rng(seed))
 
     def randint(self, a: int, b: int) -> int:
-        return self._r.randint(a, b)
+        return int(self._r.integers(a, b, endpoint=True))
 
     def choice(self, seq):
-        return self._r.choice(seq)
+        if len(seq) == 0:
+            raise IndexError("Cannot choose from an empty sequence")
+        return seq[int(self._r.integers(len(seq)))]
+
+    def choice_without_replacement(self, n: int, k: int) -> np.ndarray:
+        """
+        Return k distinct indices drawn uniformly from range(n).
+
+        Takes a prefix of one permutation, which for small n is several times
+        faster than Generator.choice(n, k, replace=False).
+        """
+        return self._r.permutation(n)[:k]
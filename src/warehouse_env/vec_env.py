@@ -0,0 +1,308 @@
+from __future__ import annotations
+from typing import Any, Dict, Tuple
+import numpy as np
+from .config import EnvConfig
+from .env import WarehouseEnv, OBS_HEADER_SIZE
+from .state import STATE_DTYPE
+from ._kernels import (
+    DX,
+    DY,
+    R_STEP,
+    R_BUMP,
+    R_DROP_WRONG,
+    R_PICKUP,
+    R_DELIVER,
+    EVENT_MOVE,
+    EVENT_BUMP,
+    EVENT_PICKUP,
+    EVENT_PICKUP_FAILED_ALREADY_CARRYING,
+    EVENT_PICKUP_FAILED_NO_PACKAGE,
+    EVENT_DROP_FAILED_NOT_CARRYING,
+    EVENT_DELIVER,
+    EVENT_DROP,
+    DONE_NONE,
+    DONE_MAX_STEPS,
+    DONE_BATTERY_EMPTY,
+    DONE_ALL_DELIVERED,
+)
+
+# Movement delta tables as arrays so a whole action batch indexes them at once
+_DX = np.array(DX, dtype=np.int32)
+_DY = np.array(DY, dtype=np.int32)
+
+class VecWarehouseEnv:
+    """
+    A batch of independent warehouse environments stepped together.
+
+    Every environment follows exactly the same rules as WarehouseEnv, but the
+    state of all of them is held in NumPy arrays with a leading batch axis and
+    each step is computed with array operations across the whole batch.
+
+    Per environment scalars are packed into a STATE_DTYPE record and package
+    coordinates are stored as uint8, so the configuration must fit those
+    widths (see _check_config_fits).
+
+    Public API
+    reset(seed) -> (num_envs, obs_size) int32 observations
+    reset_env(index, seed) -> observation row for one environment
+    step_batch(actions) -> (observations, rewards, dones, info)
+
+    Observation rows use the same layout as WarehouseEnv.obs_array().
+    """
+
+    def __init__(self, num_envs: int, config: EnvConfig | None = None):
+        """
+        Create a batch of environments sharing one configuration.
+
+        Parameters
+        num_envs:
+            Number of environments in the batch.
+        config:
+            Optional environment configuration. If None, uses EnvConfig()
+            with its default values.
+
+        Notes
+        This does not start any episode. Call reset() before step_batch().
+        """
+        if num_envs < 1:
+            raise ValueError(f"num_envs must be at least 1, got {num_envs}")
+
+        self.num_envs = num_envs
+        self.cfg = config or EnvConfig()
+        _check_config_fits(self.cfg)
+
+        # Layouts come from a single env so that batch slot i starts exactly
+        # like WarehouseEnv.reset() with the same seed
+        self._layout_env = WarehouseEnv(self.cfg)
+        self.goal_pos = self._layout_env.goal_pos
+        self.obs_size = self._layout_env.obs_size
+
+        n = num_envs
+        p = self.cfg.num_packages
+        cells = (self.cfg.width + 2) * (self.cfg.height + 2)
+
+        # One packed record per env. The named attributes are views of its
+        # fields, so updating them updates the record in place.
+        self.state = np.zeros(n, dtype=STATE_DTYPE)
+        self.state["carry"] = -1
+        self.agent_x = self.state["ax"]
+        self.agent_y = self.state["ay"]
+        self.carrying_id = self.state["carry"]
+        self.battery = self.state["battery"]
+        self.step_count = self.state["step"]
+        self.undelivered = self.state["undelivered"]
+
+        # Packages as (num_envs, num_packages) arrays indexed by package id
+        self.pkg_x = np.zeros((n, p), dtype=np.uint8)
+        self.pkg_y = np.zeros((n, p), dtype=np.uint8)
+        self.pkg_delivered = np.zeros((n, p), dtype=np.uint8)
+
+        # One row per env, padded like EnvState.walls so the border is a wall
+        self.walls = np.zeros((n, cells), dtype=bool)
+
+        self._env_idx = np.arange(n)
+        self._started = False
+
+    def reset(self, seed: int | None = None) -> np.ndarray:
+        """
+        Start a new episode in every environment.
+
+        Parameters
+        seed:
+            Base seed. Environment i is reset with seed + i, so it matches a
+            WarehouseEnv reset with that seed. None behaves like seed 0.
+
+        Returns
+        The (num_envs, obs_size) int32 observation array.
+        """
+        base = 0 if seed is None else seed
+        for i in range(self.num_envs):
+            self._load(i, base + i)
+        self._started = True
+        return self.obs_array()
+
+    def reset_env(self, index: int, seed: int | None = None) -> np.ndarray:
+        """
+        Start a new episode in a single environment of the batch.
+
+        Useful for restarting environments that reported done while the
+        others keep running. Returns that environment's observation row.
+        """
+        if not self._started:
+            raise RuntimeError("Call reset() before reset_env().")
+        self._load(index, seed)
+        return self.obs_array()[index]
+
+    def step_batch(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        Apply one action per environment and advance all of them by one step.
+
+        Parameters
+        actions:
+            Integer array of shape (num_envs,) using the WarehouseEnv action
+            encoding.
+
+        Returns
+        observations:
+            (num_envs, obs_size) int32 array.
+        rewards:
+            (num_envs,) float64 array.
+        dones:
+            (num_envs,) bool array.
+        info:
+            "event" and "done_reason" int8 arrays of codes. Map them to the
+            WarehouseEnv strings with _kernels.EVENT_NAMES and DONE_REASONS.
+        """
+        if not self._started:
+            raise RuntimeError("Call reset() before step_batch().")
+
+        actions = np.asarray(actions)
+        if actions.shape != (self.num_envs,):
+            raise ValueError(f"actions must have shape ({self.num_envs},), got {actions.shape}")
+        if ((actions < 0) | (actions > 5)).any():
+            raise ValueError(f"Invalid action in batch: {actions}")
+
+        W = self.cfg.width
+        gx, gy = self.goal_pos
+        R = self.cfg._rewards
+        ax = self.agent_x
+        ay = self.agent_y
+        carrying = self.carrying_id
+
+        # Start with the per step penalty
+        reward = np.full(self.num_envs, 0.0)
+        reward += R[R_STEP]
+        event = np.empty(self.num_envs, dtype=np.int8)
+
+        # Movement actions, bumps leave the agent in place. The deltas are
+        # int32 so the uint8 coordinates widen and -1 does not wrap around,
+        # and the padding ring turns out of bounds moves into wall bumps.
+        move = actions < 4
+        nx = ax + _DX[actions]
+        ny = ay + _DY[actions]
+        free = ~self.walls[self._env_idx, (ny + 1) * (W + 2) + nx + 1]
+        moved = move & free
+        bumped = move & ~free
+        ax[moved] = nx[moved]
+        ay[moved] = ny[moved]
+        event[moved] = EVENT_MOVE
+        event[bumped] = EVENT_BUMP
+        reward[bumped] += R[R_BUMP]
+
+        # Pickup takes the lowest id undelivered package under the agent
+        pick = actions == 4
+        event[pick & (carrying >= 0)] = EVENT_PICKUP_FAILED_ALREADY_CARRYING
+        trying = pick & (carrying < 0)
+        if self.cfg.num_packages:
+            under = (self.pkg_x == ax[:, None]) & (self.pkg_y == ay[:, None]) & (self.pkg_delivered == 0)
+            picked = trying & under.any(axis=1)
+            carrying[picked] = under.argmax(axis=1)[picked]
+        else:
+            picked = np.zeros(self.num_envs, dtype=bool)
+        event[trying & ~picked] = EVENT_PICKUP_FAILED_NO_PACKAGE
+        event[picked] = EVENT_PICKUP
+        reward[picked] += R[R_PICKUP]
+
+        # Drop anywhere. If at goal while carrying, counts as delivery
+        drop = actions == 5
+        event[drop & (carrying < 0)] = EVENT_DROP_FAILED_NOT_CARRYING
+        dropping = drop & (carrying >= 0)
+        at_goal = (ax == gx) & (ay == gy)
+        delivered = dropping & at_goal
+        dropped_wrong = dropping & ~at_goal
+        # Carried packages only get a position again when they are dropped
+        d = np.flatnonzero(dropping)
+        self.pkg_x[d, carrying[d]] = ax[d]
+        self.pkg_y[d, carrying[d]] = ay[d]
+        d = np.flatnonzero(delivered)
+        self.pkg_delivered[d, carrying[d]] = 1
+        self.undelivered[d] -= 1
+        carrying[dropping] = -1
+        event[delivered] = EVENT_DELIVER
+        event[dropped_wrong] = EVENT_DROP
+        reward[delivered] += R[R_DELIVER]
+        reward[dropped_wrong] += R[R_DROP_WRONG]
+
+        # Update time and resources each step
+        self.step_count += 1
+        self.battery[self.battery > 0] -= 1
+
+        # Termination checks, in the same priority order as WarehouseEnv
+        done_reason = np.select(
+            [self.step_count >= self.cfg.max_steps, self.battery == 0, self.undelivered == 0],
+            [DONE_MAX_STEPS, DONE_BATTERY_EMPTY, DONE_ALL_DELIVERED],
+            DONE_NONE,
+        ).astype(np.int8)
+
+        info = {"event": event, "done_reason": done_reason}
+        return self.obs_array(), reward, done_reason != DONE_NONE, info
+
+    def obs_array(self, out: np.ndarray | None = None) -> np.ndarray:
+        """
+        Write the current observation of every environment into a 2D array.
+
+        Parameters
+        out:
+            Optional int32 array of shape (num_envs, obs_size) to fill in
+            place instead of allocating a new one.
+
+        Returns
+        The filled (num_envs, obs_size) int32 array.
+        """
+        shape = (self.num_envs, self.obs_size)
+        if out is None:
+            out = np.empty(shape, dtype=np.int32)
+        elif out.shape != shape:
+            raise ValueError(f"out must have shape {shape}, got {out.shape}")
+
+        out[:, 0] = self.agent_x
+        out[:, 1] = self.agent_y
+        out[:, 2] = self.battery
+        out[:, 3] = self.carrying_id
+        out[:, 4] = self.step_count
+        out[:, OBS_HEADER_SIZE::3] = self.pkg_x
+        out[:, OBS_HEADER_SIZE + 1::3] = self.pkg_y
+        out[:, OBS_HEADER_SIZE + 2::3] = self.pkg_delivered
+
+        # Carried packages travel with their agent
+        c = np.flatnonzero(self.carrying_id >= 0)
+        col = OBS_HEADER_SIZE + 3 * self.carrying_id[c].astype(np.intp)
+        out[c, col] = self.agent_x[c]
+        out[c, col + 1] = self.agent_y[c]
+        return out
+
+    def _load(self, i: int, seed: int | None) -> None:
+        """
+        Generate a fresh episode layout with WarehouseEnv and copy it into slot i.
+        """
+        self._layout_env.reset(seed=seed)
+        s = self._layout_env._state
+        assert s is not None
+
+        self.agent_x[i], self.agent_y[i] = s.agent_pos
+        self.carrying_id[i] = -1
+        self.battery[i] = s.battery
+        self.step_count[i] = 0
+        self.undelivered[i] = s.undelivered
+        self.pkg_x[i] = s.pkg_x
+        self.pkg_y[i] = s.pkg_y
+        self.pkg_delivered[i] = s.pkg_delivered
+        self.walls[i] = s.walls != 0
+
+def _check_config_fits(cfg: EnvConfig) -> None:
+    """
+    Raise ValueError if cfg does not fit the packed STATE_DTYPE field widths.
+    """
+    limits = [
+        ("width", cfg.width, 0, 255),
+        ("height", cfg.height, 0, 255),
+        ("battery_capacity", cfg.battery_capacity, 0, 255),
+        # step_count is reported in the int32 observation. It starts at 0, so
+        # max_steps needs no lower bound.
+        ("max_steps", cfg.max_steps, None, 2**31 - 1),
+        ("num_packages", cfg.num_packages, 0, 127),
+    ]
+    for name, value, low, high in limits:
+        if value > high or (low is not None and value < low):
+            bounds = f"<= {high}" if low is None else f"in [{low}, {high}]"
+            raise ValueError(f"VecWarehouseEnv requires {name} {bounds}, got {value}")
@@ -48,3 +48,29 @@ def test_different_seed_usually_changes_reset():
     env2 = WarehouseEnv(EnvConfig(width=5, height=5, num_packages=1))
     o2 = env2.reset(seed=2)
     assert o1 != o2
+
+def test_walls_observation_is_cached_per_episode():
+    """
+    Walls never change during an episode, so every step must report the same
+    sorted tuple instead of rebuilding it.
+    """
+    env = WarehouseEnv(EnvConfig(width=7, height=7, num_packages=1, wall_fraction=0.3))
+    walls = env.reset(seed=7)["walls"]
+    assert isinstance(walls, tuple)
+    assert list(walls) == sorted(walls)
+    for a in [1, 3, 1, 3, 4, 5]:
+        obs, _, _, _ = env.step(a)
+        assert obs["walls"] is walls
+
+def test_negative_and_large_seeds():
+    """
+    Any Python int is a valid seed. Negative and very large seeds must be
+    deterministic and give layouts of their own.
+    """
+    actions = [3, 3, 1, 1, 4, 3, 1, 5, 0, 2, 2]
+    for seed in (-1, -123, 2**64, 2**100, -(2**100)):
+        assert rollout(seed, actions) == rollout(seed, actions)
+
+    cfg = EnvConfig(width=7, height=7, num_packages=2, wall_fraction=0.3)
+    resets = {WarehouseEnv(cfg).reset(seed=seed)["walls"] for seed in (1, -1, 2**64, -(2**64))}
+    assert len(resets) == 4
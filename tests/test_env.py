@@ -0,0 +1,141 @@
+import copy
+import dataclasses
+import pickle
+import re
+
+import numpy as np
+import pytest
+
+from warehouse_env import WarehouseEnv, EnvConfig
+from warehouse_env.env import OBS_HEADER_SIZE
+
+def expected_obs_array(obs) -> list[int]:
+    """
+    Build the obs_array() layout from a dictionary observation.
+    """
+    x, y = obs["agent_pos"]
+    carrying = -1 if obs["carrying"] is None else obs["carrying"]
+    flat = [x, y, obs["battery"], carrying, obs["step_count"]]
+    for (px, py), d in obs["packages"]:
+        flat += [px, py, d]
+    return flat
+
+def test_obs_array_matches_dict_observation():
+    """
+    obs_array() must hold the same values as the dictionary observation,
+    including a carried package reported at the agent position.
+    """
+    cfg = EnvConfig(width=5, height=5, num_packages=2, max_steps=50, battery_capacity=50, wall_fraction=0.0)
+    env = WarehouseEnv(cfg)
+    obs = env.reset(seed=3)
+    assert env.obs_array().tolist() == expected_obs_array(obs)
+
+    # Walk to the first package, pick it up and carry it around
+    tx, ty = obs["packages"][0][0]
+    path = [3] * tx + [1] * ty + [4, 2, 0, 3, 1, 5]
+    out = np.full(env.obs_size, -99, dtype=np.int32)
+    carried = False
+    for a in path:
+        obs, _, done, _ = env.step(a)
+        assert obs["carrying"] is None or obs["packages"][obs["carrying"]][0] == obs["agent_pos"]
+        carried |= obs["carrying"] is not None
+
+        # out is filled in place and returned
+        assert env.obs_array(out) is out
+        assert out.tolist() == expected_obs_array(obs)
+        assert env.obs_array().tolist() == expected_obs_array(obs)
+        if done:
+            break
+    assert carried
+
+def test_obs_array_layout():
+    """
+    The header is followed by one (x, y, delivered) triple per package.
+    """
+    cfg = EnvConfig(width=6, height=4, num_packages=3)
+    env = WarehouseEnv(cfg)
+    env.reset(seed=11)
+    arr = env.obs_array()
+    assert arr.dtype == np.int32
+    assert arr.shape == (OBS_HEADER_SIZE + 3 * cfg.num_packages,) == (env.obs_size,)
+
+def test_config_reward_table_stays_read_only_after_copy():
+    """
+    Configs are pickled when sent to worker processes, and the copy must keep
+    a read only reward table that matches its fields.
+    """
+    cfg = EnvConfig(penalty_step=-0.5, reward_deliver=10.0)
+    for c in (pickle.loads(pickle.dumps(cfg)), copy.deepcopy(cfg), copy.copy(cfg)):
+        assert c == cfg
+        assert not c._rewards.flags.writeable
+        assert c._rewards.tolist() == cfg._rewards.tolist()
+        with pytest.raises(ValueError):
+            c._rewards[0] = 99
+
+ESCAPE = re.compile(r"\x1b\[(\d+);(\d+)H(\x1b\[2K)?")
+
+def apply_ansi(screen: dict[int, list[str]], frame: str) -> int:
+    """
+    Apply the cursor moves and line clears used by render_diff() to a screen
+    of rows keyed by 1-based row number. Returns the number of cursor moves.
+    """
+    matches = list(ESCAPE.finditer(frame))
+    assert frame == "" or frame.startswith("\x1b[")
+    for m, nxt in zip(matches, matches[1:] + [None]):
+        row, col = int(m.group(1)), int(m.group(2))
+        line = screen.setdefault(row, [])
+        if m.group(3):
+            line.clear()
+        text = frame[m.end():nxt.start() if nxt else len(frame)]
+        for i, ch in enumerate(text):
+            c = col - 1 + i
+            line.extend(" " * (c + 1 - len(line)))
+            line[c] = ch
+    return len(matches)
+
+def screen_text(screen: dict[int, list[str]], origin_row: int) -> str:
+    """
+    Return the screen rows from origin_row down, joined like render().
+    """
+    rows = range(origin_row, max(screen) + 1)
+    return "\n".join("".join(screen.get(r, [])) for r in rows)
+
+def test_render_diff_reproduces_render():
+    """
+    Replaying render_diff() output on a terminal must always show the same
+    frame as render(), and one move must only redraw the two cells involved.
+    """
+    cfg = EnvConfig(width=6, height=5, num_packages=2, max_steps=40, wall_fraction=0.0)
+    env = WarehouseEnv(cfg)
+    origin = 3
+    screen: dict[int, list[str]] = {}
+
+    env.reset(seed=5)
+    apply_ansi(screen, env.render_diff(origin))
+    assert screen_text(screen, origin) == env.render()
+
+    # Header line plus the old and new agent cells
+    env.step(3)
+    assert apply_ansi(screen, env.render_diff(origin)) == 3
+    assert screen_text(screen, origin) == env.render()
+
+    for seed, actions in ((5, [1, 1, 4, 3, 3, 5, 0, 2]), (6, [3, 1, 4, 5, 2, 2, 0])):
+        env.reset(seed=seed)
+        apply_ansi(screen, env.render_diff(origin))
+        assert screen_text(screen, origin) == env.render()
+        for a in actions:
+            env.step(a)
+            apply_ansi(screen, env.render_diff(origin))
+            assert screen_text(screen, origin) == env.render()
+
+def test_config_reward_table_is_not_a_dataclass_field():
+    """
+    The reward table is derived state, so the dataclass API must only expose
+    the configuration fields and round trip through asdict().
+    """
+    cfg = EnvConfig(width=9, penalty_bump=-2.0)
+    assert "_rewards" not in {f.name for f in dataclasses.fields(cfg)}
+    assert "_rewards" not in dataclasses.asdict(cfg)
+    assert "_rewards" not in repr(cfg)
+    assert EnvConfig(**dataclasses.asdict(cfg)) == cfg
+    assert hash(EnvConfig(**dataclasses.asdict(cfg))) == hash(cfg)
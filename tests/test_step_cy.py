@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from warehouse_env import WarehouseEnv, EnvConfig
+from warehouse_env._kernels import step_kernel, step_kernel_py
+
+step_cy = pytest.importorskip("warehouse_env._step_cy")
+
+def test_9x9_kernel_matches_generic_kernel():
+    """
+    The compiled 9 x 9 kernel must produce exactly the same trajectories as
+    the generic kernel it replaces.
+    """
+    cfg = EnvConfig(width=9, height=9, num_packages=3, max_steps=400, battery_capacity=250, wall_fraction=0.15)
+    rng = random.Random(0)
+    for seed in range(20):
+        fast = WarehouseEnv(cfg)
+        generic = WarehouseEnv(cfg)
+        assert fast._step_kernel is step_cy.step_9x9
+        generic._step_kernel = step_kernel
+
+        assert fast.reset(seed=seed) == generic.reset(seed=seed)
+        for _ in range(cfg.max_steps):
+            a = rng.choice([0, 1, 2, 3, 1, 3, 4, 5])
+            step = fast.step(a)
+            assert step == generic.step(a)
+            if step[2]:
+                break
+
+def test_9x9_kernel_accepts_the_generic_config_range():
+    """
+    Configs the generic kernel accepts must also work on 9 x 9 grids, either
+    through the compiled kernel or by falling back to plain Python.
+    """
+    cases = [
+        (EnvConfig(width=9, height=9, max_steps=10**10), step_cy.step_9x9),
+        (EnvConfig(width=9, height=9, battery_capacity=10**12), step_cy.step_9x9),
+        (EnvConfig(width=9, height=9, battery_capacity=0), step_cy.step_9x9),
+        (EnvConfig(width=9, height=9, battery_capacity=-5), step_cy.step_9x9),
+        (EnvConfig(width=9, height=9, max_steps=2**70), step_kernel_py),
+        (EnvConfig(width=9, height=9, battery_capacity=float("inf")), step_kernel_py),
+    ]
+    for cfg, kernel in cases:
+        env = WarehouseEnv(cfg)
+        generic = WarehouseEnv(cfg)
+        assert env._step_kernel is kernel
+        generic._step_kernel = step_kernel_py
+
+        assert env.reset(seed=1) == generic.reset(seed=1)
+        for a in [3, 1, 4, 3, 1, 5, 0, 2]:
+            assert env.step(a) == generic.step(a)
@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import pytest
+
+from warehouse_env import WarehouseEnv, VecWarehouseEnv, EnvConfig
+from warehouse_env._kernels import EVENT_NAMES, DONE_REASONS
+
+def test_vec_env_matches_single_envs():
+    """
+    Every batch slot must follow the same trajectory as a WarehouseEnv reset
+    with the matching seed and fed the same actions.
+    """
+    cfg = EnvConfig(width=5, height=4, num_packages=2, max_steps=60, battery_capacity=40, wall_fraction=0.2)
+    n = 16
+    vec = VecWarehouseEnv(n, cfg)
+    envs = [WarehouseEnv(cfg) for _ in range(n)]
+
+    obs = vec.reset(seed=100)
+    for i, env in enumerate(envs):
+        env.reset(seed=100 + i)
+        assert np.array_equal(obs[i], env.obs_array())
+
+    rng = random.Random(0)
+    for _ in range(cfg.max_steps):
+        actions = np.array([rng.choice([0, 1, 2, 3, 1, 3, 4, 5]) for _ in range(n)])
+        obs, rewards, dones, info = vec.step_batch(actions)
+        for i, env in enumerate(envs):
+            _, r, done, env_info = env.step(int(actions[i]))
+            assert np.array_equal(obs[i], env.obs_array())
+            assert rewards[i] == r
+            assert dones[i] == done
+            assert EVENT_NAMES[info["event"][i]] == env_info["event"]
+            assert DONE_REASONS[info["done_reason"][i]] == env_info.get("done_reason")
+
+def test_vec_env_stays_done_past_max_steps():
+    """
+    Stepping a slot that already hit max_steps must keep reporting done, even
+    for the largest max_steps the packed record accepts.
+    """
+    cfg = EnvConfig(width=5, height=5, num_packages=1, max_steps=65535, battery_capacity=255)
+    vec = VecWarehouseEnv(1, cfg)
+    env = WarehouseEnv(cfg)
+    vec.reset(seed=4)
+    env.reset(seed=4)
+
+    # Jump to the last step instead of playing 65535 of them
+    vec.step_count[:] = cfg.max_steps - 1
+    env._state.step_count = cfg.max_steps - 1
+    vec.battery[:] = env._state.battery = 255
+
+    for _ in range(3):
+        obs, _, dones, info = vec.step_batch(np.array([0]))
+        _, _, done, env_info = env.step(0)
+        assert np.array_equal(obs[0], env.obs_array())
+        assert dones[0] and done
+        assert DONE_REASONS[info["done_reason"][0]] == env_info["done_reason"] == "max_steps"
+
+def test_vec_env_rejects_configs_outside_packed_widths():
+    """
+    Values the packed record cannot hold must raise ValueError up front
+    instead of overflowing or wrapping when a slot is loaded.
+    """
+    for kwargs in (
+        {"battery_capacity": -5},
+        {"battery_capacity": 256},
+        {"num_packages": -1},
+        {"num_packages": 128},
+        {"width": 256},
+        {"max_steps": 2**31},
+    ):
+        with pytest.raises(ValueError, match=next(iter(kwargs))):
+            VecWarehouseEnv(2, EnvConfig(**kwargs))